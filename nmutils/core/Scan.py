@@ -49,6 +49,12 @@ class Scan(object):
         # are made.
         self.positions = None
 
+        # Optional (lines, points) shape of a regular raster scan, which
+        # _readPositions can set when the positions lie on a grid, line
+        # by line and in the same direction on every line (no snaking).
+        # The scanViewer then reshapes maps instead of interpolating.
+        self.gridShape = None
+
         # Optional metadata fields filled in by _readPositions and
         # _readData which can be used later for plotting or labeling.
         self.positionDimLabels = [] # labels for each of the scanning dimensions
@@ -266,7 +272,7 @@ class Scan(object):
 
         # copy all the non-data attributes
         for key in self.__dict__.keys():
-            if key not in ['data', 'positions']:
+            if key not in ['data', 'positions', 'gridShape']:
                 exec("new.%s = cp.deepcopy(self.%s)" % (key, key))
         for dataset in self.data.keys():
             new.data[dataset] = None
@@ -280,6 +286,7 @@ class Scan(object):
         """
         assert self.data.keys() == scanobj.data.keys()
         self.positions = np.concatenate((self.positions, scanobj.positions), axis=0)
+        self.gridShape = None
         for key in self.data.keys():
             self.data[key] = np.concatenate((self.data[key], scanobj.data[key]), axis=0)
 
@@ -384,7 +391,8 @@ class Scan(object):
 
         return x, y, z
     
-    def export(self, filepath, method='reshape', shape=None, oversampling=1, equal=True):
+    def export(self, filepath, method='reshape', shape=None, oversampling=1, equal=True,
+               chunkSize=1<<20, compression='lzf'):
         """ 
         Dumps data into a single HDF5 file in order to allow export into other software
         or reload later.
@@ -398,12 +406,16 @@ class Scan(object):
         oversampling: the oversampling ratio relative to the typical step size,
                       used with "resample"
         equal:  use equal step sizes in x and y for "resample"
+        chunkSize: target size of the HDF5 chunks in bytes
+        compression: "lzf", "gzip", "bitshuffle" (with LZ4, needs hdf5plugin)
+                     or None
         """
         # this only applies for 1D and 2D scans
         assert self.nDimensions in (1, 2)
 
         # check input arguments
         assert method in ('reshape', 'resample', 'none')
+        comp = self._compressionArgs(compression)
 
         # export to hdf5 file
         with h5py.File(filepath, 'w-', libver='earliest') as h5f:
@@ -426,16 +438,16 @@ class Scan(object):
                     if not np.prod(shape) == self.nPositions:
                         raise Exception('Something went really wrong when trying to reshape the scan grid')
                     print("Fast axis detectected to be: %s" % (fast_axis_label,))
-                dset = h5f.create_dataset(name=grp_path+"/positions_x", data=self.positions[:,0], shape=shape, dtype=np.float, compression="lzf")
-                dset = h5f.create_dataset(name=grp_path+"/positions_y", data=self.positions[:,1], shape=shape, dtype=np.float, compression="lzf")
+                dset = h5f.create_dataset(name=grp_path+"/positions_x", data=self.positions[:,0], shape=shape, dtype=np.float, **comp)
+                dset = h5f.create_dataset(name=grp_path+"/positions_y", data=self.positions[:,1], shape=shape, dtype=np.float, **comp)
             elif method == 'resample':
                 x, y = self.interpolatedMap(np.zeros(self.nPositions), oversampling, equal=equal)[:2]
                 shape = x.shape
-                dset = h5f.create_dataset(name=grp_path+"/positions_x", data=x, dtype=np.float, compression="lzf")
-                dset = h5f.create_dataset(name=grp_path+"/positions_y", data=y, dtype=np.float, compression="lzf")
+                dset = h5f.create_dataset(name=grp_path+"/positions_x", data=x, dtype=np.float, **comp)
+                dset = h5f.create_dataset(name=grp_path+"/positions_y", data=y, dtype=np.float, **comp)
             elif method == 'none':
-                dset = h5f.create_dataset(name=grp_path+"/positions_x", data=self.positions[:,0], dtype=np.float, compression="lzf")
-                dset = h5f.create_dataset(name=grp_path+"/positions_y", data=self.positions[:,1], dtype=np.float, compression="lzf")
+                dset = h5f.create_dataset(name=grp_path+"/positions_x", data=self.positions[:,0], dtype=np.float, **comp)
+                dset = h5f.create_dataset(name=grp_path+"/positions_y", data=self.positions[:,1], dtype=np.float, **comp)
             # create datasets
             for dsetname in self.data.keys():
                 # total data shape
@@ -445,7 +457,7 @@ class Scan(object):
                     shp = self.data[dsetname].shape
                 # chunking
                 dt = self.data[dsetname].dtype
-                chunk = self._calcChunkSize(shp, dt.itemsize)
+                chunk = self._calcChunkSize(shp, dt.itemsize, chunkSize)
                 print("%s, shape: %s, chunk: %s" % (dsetname, shp, chunk,))
                 # what data to write?
                 if method in ('reshape', 'none'):
@@ -454,16 +466,38 @@ class Scan(object):
                     data = self.interpolatedMap(self.data[dsetname], oversampling, equal=equal)[-1]
                 # write it
                 if chunk not in [None,[]]:
-                    dset = h5f.create_dataset(name=grp_path+"/"+dsetname, data=data, shape=shp, chunks=chunk, dtype=dt, compression="lzf")
+                    dset = h5f.create_dataset(name=grp_path+"/"+dsetname, data=data, shape=shp, chunks=chunk, dtype=dt, **comp)
                 else:
-                    dset = h5f.create_dataset(name=grp_path+"/"+dsetname, data=data, shape=shp, dtype=dt, compression="lzf")
+                    dset = h5f.create_dataset(name=grp_path+"/"+dsetname, data=data, shape=shp, dtype=dt, **comp)
             print("Scan data were exported to %s:%s" % (filepath,grp_path,))
 
-    def _calcChunkSize(self,shape,dsize):
+    @staticmethod
+    def _compressionArgs(compression):
+        """ 
+        Returns the h5py create_dataset keyword arguments for an export
+        compression option.
+        """
+        if compression in (None, 'none'):
+            return {}
+        elif compression == 'bitshuffle':
+            # registers the filter with h5py, imported only when needed
+            import hdf5plugin
+            return dict(hdf5plugin.Bitshuffle())
+        elif compression in ('lzf', 'gzip'):
+            return {'compression': compression}
+        raise ValueError("Unknown compression '%s'" % compression)
+
+    def _calcChunkSize(self,shape,dsize,maxChunkSz=1<<20):
         """ 
         Returns optimal shape of chunks for this type of data. Returns none if chunking is discouraged.
+
+        Chunks are grown from the last dimension, so for 1D data a chunk
+        holds whole spectra for a block of positions, and a channel range
+        summed over all positions reads each chunk once. Chunks are kept
+        within 1 MiB, which is the size of the default HDF5 chunk cache;
+        larger chunks are decompressed again for every partial read.
+        The target maxChunkSz is in bytes, 1<<20 being 1 MiB.
         """
-        maxChunkSz = 1 << 22 # 22 ... 4Mib, 20 ... 1MiB, 10 ... 1kiB
         # determine chunk dimensions
         dims = len(shape)
         if dims==0:
@@ -478,14 +512,14 @@ class Scan(object):
                 return (int(maxChunkSz/dsize),) 
         else:
             # try chunking just on the last dimension
-            chunk = self._calcChunkSize(shape[-1:], dsize)
+            chunk = self._calcChunkSize(shape[-1:], dsize, maxChunkSz)
             if chunk:
                 # chunking here is adviced, just do it
                 return (1,)*(dims-1) + chunk 
             else:
                 # chunking on the last dim is not adviced (too small), try next
                 dsz = shape[-1]*dsize
-                chunk = self._calcChunkSize(shape[:-1], dsz)
+                chunk = self._calcChunkSize(shape[:-1], dsz, maxChunkSz)
                 if chunk:
                     # use chunking
                     return chunk + (shape[-1],)
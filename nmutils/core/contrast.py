@@ -247,7 +247,8 @@ class contrast_scan(Scan):
                     i0, i1 = self.xrfCropping
                 else:
                     i0, i1 = 0, dset.shape[-1]-10 # last bins annoying
-                data = np.sum(dset[:, self.xrfChannels, i0:i1], axis=1)
+                # h5py wants the channel list in increasing order
+                data = np.sum(dset[:, sorted(self.xrfChannels), i0:i1], axis=1)
 
             if self.I0:
                 print('****, %s, %s, %s'%(data.shape, I0_data.shape, I0_data[:, None].shape))
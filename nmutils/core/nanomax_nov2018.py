@@ -492,16 +492,21 @@ class stepscan_nov2018(Scan):
                     # x is the fast motor
                     y = y.repeat(nx)
                     x = np.tile(x, ny)
+                    lineLen = nx
                 else:
                     # y is the fast motor
                     x = x.repeat(ny)
                     y = np.tile(y, nx)
+                    lineLen = ny
             else:
                 x = np.array(hf.get('entry%d' % self.scanNr + '/measurement/%s' % self.xMotor))
                 y = np.array(hf.get('entry%d' % self.scanNr + '/measurement/%s' % self.yMotor))
             if self.nMaxPositions:
                 x = x[:self.nMaxPositions]
                 y = y[:self.nMaxPositions]
+            # nominal positions form a raster, so let maps be reshaped
+            if self.nominalPositions and len(x) % lineLen == 0:
+                self.gridShape = (len(x) // lineLen, lineLen)
             if 'sams_' in self.xMotor:
                 x *= 1000
             if 'sams_' in self.yMotor:
@@ -39,8 +39,11 @@ class PtychoViewer(qt.QMainWindow):
         self.ui = design.Ui_MainWindow()
         self.ui.setupUi(self)
 
-        # keep a ProbeManager instance
-        self.probeManager = ProbeManager(self.ui)
+        # the probe tab is only built when first shown, so the
+        # ProbeManager is created then and fed any data loaded before
+        self.probeManager = None
+        self._probeData = None
+        self.ui.tabWidget.currentChanged.connect(self._probeTabShown)
 
         # possibly set initial values
         if filename:
@@ -62,9 +65,17 @@ class PtychoViewer(qt.QMainWindow):
         # dummy scan
         self.scan = None
 
+    def _probeTabShown(self, index):
+        if self.probeManager is not None:
+            return
+        if index != self.ui.tabWidget.indexOf(self.ui.probe):
+            return
+        self.probeManager = ProbeManager(self.ui)
+        if self._probeData is not None:
+            self.probeManager.set_data(*self._probeData)
+
     def statusOutput(self, msg):
         self.ui.statusbar.showMessage(msg)
-        self.ui.statusbar.showMessage(msg)
 
     def load(self):
         try:
@@ -90,7 +101,9 @@ class PtychoViewer(qt.QMainWindow):
             
             # give loaded data to the widgets
             self.ui.objectWidget.set_data(obj, origin, psize)
-            self.probeManager.set_data(probe, psize, energy)
+            self._probeData = (probe, psize, energy)
+            if self.probeManager is not None:
+                self.probeManager.set_data(probe, psize, energy)
             self.ui.modeWidget.set_data(probes, psize)
 
             self.statusOutput("")
@@ -12,14 +12,21 @@ from silx.gui import qt as QtCore
 QtGui = QtCore
 QtWidgets = QtCore
 
+# the icon is decoded once and shared between all windows
+_APP_ICON = None
+
 
 class Ui_MainWindow(object):
     def setupUi(self, MainWindow):
+        global _APP_ICON
+        # registers the icon resources, on first use only
+        from . import design_rc  # noqa: F401
         MainWindow.setObjectName("MainWindow")
         MainWindow.resize(1082, 758)
-        icon = QtGui.QIcon()
-        icon.addPixmap(QtGui.QPixmap(":/logos/icon.png"), QtGui.QIcon.Normal, QtGui.QIcon.Off)
-        MainWindow.setWindowIcon(icon)
+        if _APP_ICON is None:
+            _APP_ICON = QtGui.QIcon()
+            _APP_ICON.addPixmap(QtGui.QPixmap(":/logos/icon.png"), QtGui.QIcon.Normal, QtGui.QIcon.Off)
+        MainWindow.setWindowIcon(_APP_ICON)
         self.centralwidget = QtWidgets.QWidget(MainWindow)
         self.centralwidget.setObjectName("centralwidget")
         self.gridLayout_2 = QtWidgets.QGridLayout(self.centralwidget)
@@ -73,6 +80,53 @@ class Ui_MainWindow(object):
         self.probe.setObjectName("probe")
         self.horizontalLayout_2 = QtWidgets.QHBoxLayout(self.probe)
         self.horizontalLayout_2.setObjectName("horizontalLayout_2")
+        self.tabWidget.addTab(self.probe, "")
+        self.modes = QtWidgets.QWidget()
+        self.modes.setObjectName("modes")
+        self.horizontalLayout_3 = QtWidgets.QHBoxLayout(self.modes)
+        self.horizontalLayout_3.setObjectName("horizontalLayout_3")
+        self.modeWidget = ModeView(self.modes)
+        self.modeWidget.setObjectName("modeWidget")
+        self.horizontalLayout_3.addWidget(self.modeWidget)
+        self.tabWidget.addTab(self.modes, "")
+        self.gridLayout_2.addWidget(self.tabWidget, 1, 0, 1, 1)
+        MainWindow.setCentralWidget(self.centralwidget)
+        self.menubar = QtWidgets.QMenuBar(MainWindow)
+        self.menubar.setGeometry(QtCore.QRect(0, 0, 1082, 20))
+        self.menubar.setObjectName("menubar")
+        MainWindow.setMenuBar(self.menubar)
+        self.statusbar = QtWidgets.QStatusBar(MainWindow)
+        self.statusbar.setObjectName("statusbar")
+        MainWindow.setStatusBar(self.statusbar)
+
+        self.retranslateUi(MainWindow)
+        self.tabWidget.setCurrentIndex(0)
+        QtCore.QMetaObject.connectSlotsByName(MainWindow)
+        # heavy tab contents are only built when first shown
+        self._tab_factories = {self.tabWidget.indexOf(self.probe): self._build_probe_tab}
+        self.tabWidget.currentChanged.connect(self._build_tab)
+        MainWindow.setTabOrder(self.filenameBox, self.browseButton)
+        MainWindow.setTabOrder(self.browseButton, self.loadButton)
+        MainWindow.setTabOrder(self.loadButton, self.tabWidget)
+
+    def retranslateUi(self, MainWindow):
+        _translate = QtCore.QCoreApplication.translate
+        MainWindow.setWindowTitle(_translate("MainWindow", "NanoMAX Ptycho Viewer"))
+        self.browseButton.setToolTip(_translate("MainWindow", "<html><head/><body><p>Browse for data files</p></body></html>"))
+        self.browseButton.setText(_translate("MainWindow", "Browse..."))
+        self.filenameBox.setText(_translate("MainWindow", "<input file>"))
+        self.loadButton.setToolTip(_translate("MainWindow", "<html><head/><body><p>Go!</p></body></html>"))
+        self.loadButton.setText(_translate("MainWindow", "Load"))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.object), _translate("MainWindow", "Object"))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.probe), _translate("MainWindow", "Probe"))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.modes), _translate("MainWindow", "Modes"))
+
+    def _build_tab(self, index):
+        factory = self._tab_factories.pop(index, None)
+        if factory is not None:
+            factory()
+
+    def _build_probe_tab(self):
         self.splitter_2 = QtWidgets.QSplitter(self.probe)
         self.splitter_2.setOrientation(QtCore.Qt.Horizontal)
         self.splitter_2.setObjectName("splitter_2")
@@ -190,50 +244,13 @@ class Ui_MainWindow(object):
         self.horizontalFocusView.setObjectName("horizontalFocusView")
         self.verticalLayout_2.addWidget(self.horizontalFocusView)
         self.horizontalLayout_2.addWidget(self.splitter_2)
-        self.tabWidget.addTab(self.probe, "")
-        self.modes = QtWidgets.QWidget()
-        self.modes.setObjectName("modes")
-        self.horizontalLayout_3 = QtWidgets.QHBoxLayout(self.modes)
-        self.horizontalLayout_3.setObjectName("horizontalLayout_3")
-        self.modeWidget = ModeView(self.modes)
-        self.modeWidget.setObjectName("modeWidget")
-        self.horizontalLayout_3.addWidget(self.modeWidget)
-        self.tabWidget.addTab(self.modes, "")
-        self.gridLayout_2.addWidget(self.tabWidget, 1, 0, 1, 1)
-        MainWindow.setCentralWidget(self.centralwidget)
-        self.menubar = QtWidgets.QMenuBar(MainWindow)
-        self.menubar.setGeometry(QtCore.QRect(0, 0, 1082, 20))
-        self.menubar.setObjectName("menubar")
-        MainWindow.setMenuBar(self.menubar)
-        self.statusbar = QtWidgets.QStatusBar(MainWindow)
-        self.statusbar.setObjectName("statusbar")
-        MainWindow.setStatusBar(self.statusbar)
-
-        self.retranslateUi(MainWindow)
-        self.tabWidget.setCurrentIndex(0)
-        QtCore.QMetaObject.connectSlotsByName(MainWindow)
-        MainWindow.setTabOrder(self.filenameBox, self.browseButton)
-        MainWindow.setTabOrder(self.browseButton, self.loadButton)
-        MainWindow.setTabOrder(self.loadButton, self.tabWidget)
-
-    def retranslateUi(self, MainWindow):
         _translate = QtCore.QCoreApplication.translate
-        MainWindow.setWindowTitle(_translate("MainWindow", "NanoMAX Ptycho Viewer"))
-        self.browseButton.setToolTip(_translate("MainWindow", "<html><head/><body><p>Browse for data files</p></body></html>"))
-        self.browseButton.setText(_translate("MainWindow", "Browse..."))
-        self.filenameBox.setText(_translate("MainWindow", "<input file>"))
-        self.loadButton.setToolTip(_translate("MainWindow", "<html><head/><body><p>Go!</p></body></html>"))
-        self.loadButton.setText(_translate("MainWindow", "Load"))
-        self.tabWidget.setTabText(self.tabWidget.indexOf(self.object), _translate("MainWindow", "Object"))
         self.label.setText(_translate("MainWindow", "Backward"))
         self.label_3.setText(_translate("MainWindow", "Forward"))
         self.propagateButton.setText(_translate("MainWindow", "Propagate"))
         self.label_2.setText(_translate("MainWindow", "Plane of interest"))
         self.focusButton.setText(_translate("MainWindow", "Autofocus"))
         self.label_4.setText(_translate("MainWindow", "Steps"))
-        self.tabWidget.setTabText(self.tabWidget.indexOf(self.probe), _translate("MainWindow", "Probe"))
-        self.tabWidget.setTabText(self.tabWidget.indexOf(self.modes), _translate("MainWindow", "Modes"))
 from .widgets.ModeView import ModeView
 from .widgets.ObjectView import ObjectView
 from .widgets.Probe import Histogram, ProbeView, PropagationView
-from . import design_rc
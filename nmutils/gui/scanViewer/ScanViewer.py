@@ -30,14 +30,57 @@ except (ImportError, AssertionError):
 from silx.gui import qt
 if not HAS_QTCONSOLE:
     print('Interactive console not available, make sure to have qtconsole installed and working. The following line should succeed on your system, \n    python -c "from silx.gui.console import IPythonDockWidget"')
-from silx.gui.icons import getQIcon
 from . import design
 import sys
-import gc
-import numpy as np
-from scipy.interpolate import griddata
+from ast import literal_eval
 print('silx %s using %s on Python %d.%d' % (silx.version, qt.BINDING, *sys.version_info[:2]))
 
+# input widget factories for the scan options, one per option type
+def _make_spin(opt):
+    w = qt.QSpinBox()
+    w.setMaximum(9999)
+    w.setValue(opt['value'])
+    return w
+
+def _make_dspin(opt):
+    w = qt.QDoubleSpinBox()
+    w.setValue(opt['value'])
+    return w
+
+def _make_check(opt):
+    w = qt.QCheckBox()
+    w.setChecked(opt['value'])
+    return w
+
+def _make_edit_eval(opt):
+    w = qt.QLineEdit()
+    w.setText(str(opt['value']))
+    w.evaluate_me = True
+    return w
+
+def _make_combo_or_edit(opt):
+    if type(opt['type']) in (list, tuple):
+        w = qt.QComboBox()
+        defaultindex = 0
+        for j, item in enumerate(opt['type']):
+            w.addItem(item)
+            if item == opt['value']:
+                defaultindex = j
+        w.setCurrentIndex(defaultindex)
+    else:
+        w = qt.QLineEdit()
+        w.setText(opt['value'])
+        w.evaluate_me = False
+    return w
+
+_WIDGET_FACTORIES = {
+    int: _make_spin,
+    float: _make_dspin,
+    bool: _make_check,
+    list: _make_edit_eval,
+    tuple: _make_edit_eval,
+}
+
 # using the single inheritance method here, as described here,
 # http://pyqt.sourceforge.net/Docs/PyQt4/designer.html
 #
@@ -66,12 +109,22 @@ class ScanViewer(qt.QMainWindow):
         self.diffCmap = {'name':'temperature', 'autoscale':True, 'normalization':'log'}
         self.mapCmap = {'name':'gray', 'autoscale':True, 'normalization':'linear'}
 
-        # populate the scan class list
-        self.ui.scanClassBox.addItem('select scan type')
+        # option panels are built once per scan class and kept in a
+        # stack, so switching back and forth doesn't recreate widgets
+        self.ui.optionsStack = qt.QStackedWidget()
+        self.ui.optionsGrid.addWidget(self.ui.optionsStack, 0, 0)
+        self._optionPanels = {}
+        self._formWidgets = {}
+        self.formWidgets = {}
+
+        # populate the scan class list in one go
+        names = ['select scan type']
         for subclass in nmutils.core.Scan.__subclasses__():
-            self.ui.scanClassBox.addItem(subclass.__name__)
-            for subclass_ in subclass.__subclasses__():
-                self.ui.scanClassBox.addItem(subclass_.__name__)
+            names.append(subclass.__name__)
+            names.extend(subclass_.__name__ for subclass_ in subclass.__subclasses__())
+        blocked = self.ui.scanClassBox.blockSignals(True)
+        self.ui.scanClassBox.addItems(names)
+        self.ui.scanClassBox.blockSignals(blocked)
 
         # connect browse button
         def wrap():
@@ -121,10 +174,14 @@ class ScanViewer(qt.QMainWindow):
         else:
             self.console.hide()
 
-    def _current_subclass_opts(self):
-        subclass_ = str(self.ui.scanClassBox.currentText())
+    def _current_subclass(self):
+        subclass_ = self.ui.scanClassBox.currentText()
+        return getattr(nmutils.core, subclass_, None)
+
+    def _current_subclass_opts(self, subclass=None):
+        if subclass is None:
+            subclass = self._current_subclass()
         try:
-            subclass = getattr(nmutils.core, subclass_)
             opts = subclass.default_opts.copy()
         except AttributeError:
             opts = {}
@@ -137,35 +194,37 @@ class ScanViewer(qt.QMainWindow):
             if isinstance(w, qt.QCheckBox):
                 val = bool(w.isChecked())
             elif isinstance(w, qt.QComboBox):
-                val = str(w.currentText())
+                val = w.currentText()
             elif isinstance(w, qt.QLineEdit) and not w.evaluate_me:
-                val = str(w.text())
+                val = w.text()
             elif isinstance(w, qt.QLineEdit) and w.evaluate_me:
-                val = eval(str(w.text()))
+                try:
+                    val = literal_eval(w.text())
+                except (ValueError, SyntaxError):
+                    val = w.text()
             else:
                 val = w.value()
             opts[name] = val
 
         # collect special options from the top of the GUI:
         subclass_opts = self._current_subclass_opts()
-        if 'path' in subclass_opts.keys():
-            opts['path'] = str(self.ui.filenameBox.text())
-        if 'fileName' in subclass_opts.keys():
-            opts['fileName'] = str(self.ui.filenameBox.text())
-        if 'scanNr' in subclass_opts.keys():
+        if 'path' in subclass_opts:
+            opts['path'] = self.ui.filenameBox.text()
+        if 'fileName' in subclass_opts:
+            opts['fileName'] = self.ui.filenameBox.text()
+        if 'scanNr' in subclass_opts:
             opts['scanNr'] = self.ui.scanNumberBox.value()
 
         return opts
 
-    def populateOptions(self):
-        grid = self.ui.optionsGrid
-        # remove all old options
-        for i in reversed(range(grid.count())): 
-            grid.itemAt(i).widget().setParent(None)
-
-        # add new ones
-        opts = self._current_subclass_opts()
-        self.formWidgets = {}
+    def _buildOptionsPanel(self, opts):
+        """
+        Creates a widget with one row of input widgets per option, and
+        returns it together with a dict of those input widgets.
+        """
+        panel = qt.QWidget()
+        grid = qt.QGridLayout(panel)
+        formWidgets = {}
         i = 0
         for name, opt in opts.items():
             # special: the options scanNr and fileName (or path) have their input
@@ -175,70 +234,66 @@ class ScanViewer(qt.QMainWindow):
                 continue
             grid.addWidget(qt.QLabel(name), i, 0)
             grid.addWidget(qt.QLabel(opt['doc']), i, 2)
-            if opt['type'] == int:
-                w = qt.QSpinBox()
-                w.setMaximum(9999)
-                w.setValue(opt['value'])
-            elif opt['type'] == float:
-                w = qt.QDoubleSpinBox()
-                w.setValue(opt['value'])
-            elif opt['type'] == bool:
-                w = qt.QCheckBox()
-                w.setChecked(opt['value'])
-            elif opt['type'] in (list, tuple):
-                w = qt.QLineEdit()
-                w.setText(str(opt['value']))
-                w.evaluate_me = True
-            elif type(opt['type']) in (list, tuple):
-                w = qt.QComboBox()
-                defaultindex = 0
-                for j, item in enumerate(opt['type']):
-                    w.addItem(item)
-                    if item == opt['value']:
-                        defaultindex = j
-                w.setCurrentIndex(defaultindex)
-            else:
-                w = qt.QLineEdit()
-                w.setText(opt['value'])
-                w.evaluate_me = False
+            # the type field is either a type or a list of choices
+            factory = None
+            if isinstance(opt['type'], type):
+                factory = _WIDGET_FACTORIES.get(opt['type'])
+            w = factory(opt) if factory else _make_combo_or_edit(opt)
             grid.addWidget(w, i, 1)
             # save a dict of the options widgets, to parse when loading
-            self.formWidgets[name] = w
+            formWidgets[name] = w
             i += 1
 
         # add a vertical spacer on the last line to make the table more compact
         grid.setRowStretch(i, 1)
+        return panel, formWidgets
+
+    def populateOptions(self):
+        # hold off repainting until all the widgets have been updated
+        container = self.ui.centralwidget
+        container.setUpdatesEnabled(False)
+        try:
+            self._populateOptions()
+        finally:
+            container.setUpdatesEnabled(True)
+
+    def _populateOptions(self):
+        subclass_ = self.ui.scanClassBox.currentText()
+        subclass = self._current_subclass()
+        opts = self._current_subclass_opts(subclass)
+
+        # show the options panel for this class, building it if needed
+        if subclass_ not in self._optionPanels:
+            panel, formWidgets = self._buildOptionsPanel(opts)
+            self.ui.optionsStack.addWidget(panel)
+            self._optionPanels[subclass_] = panel
+            self._formWidgets[subclass_] = formWidgets
+        self.ui.optionsStack.setCurrentWidget(self._optionPanels[subclass_])
+        self.formWidgets = self._formWidgets[subclass_]
 
         # special treatment
-        oldtext = str(self.ui.filenameBox.text())
-        if 'path' in opts.keys() and oldtext.startswith('<'):
+        oldtext = self.ui.filenameBox.text()
+        if 'path' in opts and oldtext.startswith('<'):
             self.ui.filenameBox.setText('<data path>')
-        elif 'fileName' in opts.keys() and oldtext.startswith('<'):
+        elif 'fileName' in opts and oldtext.startswith('<'):
             self.ui.filenameBox.setText('<input file>')
-        self.ui.filenameBox.setDisabled(not ('path' in opts.keys() or 'fileName' in opts.keys()))
-        self.ui.browseButton.setDisabled(not ('path' in opts.keys() or 'fileName' in opts.keys()))
-        self.ui.scanNumberBox.setDisabled('scanNr' not in opts.keys())
+        takes_file = ('path' in opts or 'fileName' in opts)
+        self.ui.filenameBox.setDisabled(not takes_file)
+        self.ui.browseButton.setDisabled(not takes_file)
+        self.ui.scanNumberBox.setDisabled('scanNr' not in opts)
 
         # per-tab dataSource option
         boxes = {self.ui.dataSource2dBox:2, self.ui.dataSource1dBox:1, self.ui.dataSource0dBox:0}
-        subclass_ = str(self.ui.scanClassBox.currentText())
-        try:
-            subclass = getattr(nmutils.core, subclass_)
-        except AttributeError:
-            subclass = None
-
+        sourceDims = getattr(subclass, 'sourceDims', None)
         for box, dim in boxes.items():
             box.clear()
             if subclass is not None:
-                for name in opts['dataSource']['type']:
-                    if hasattr(subclass, 'sourceDims') and not subclass.sourceDims[name] == dim:
-                        continue
-                    box.addItem(name)
-                box.addItem('')
+                names = [name for name in opts['dataSource']['type']
+                         if sourceDims is None or sourceDims[name] == dim]
+                box.addItems(names + [''])
 
     def statusOutput(self, msg):
         self.ui.statusbar.showMessage(msg)
-        self.ui.statusbar.showMessage(msg)
 
     def _update(self):
         """
@@ -261,11 +316,10 @@ class ScanViewer(qt.QMainWindow):
             self.ui.xrfWidget.setScan(None)
             self.ui.pymcaButton.setEnabled(False)
             self.ui.scalarWidget.setScan(None)
-            # do this just to be sure
+            # the data arrays are freed by reference counting as soon as
+            # the widgets have let go, a full gc.collect() only stalls here
             del(self._scan)
             self._scan = None
-            # enforce garbage collection for good measure
-            gc.collect()
         else:
             if '2d' in scn.data.keys():
                 self.ui.xrdWidget.setScan(scn)
@@ -286,7 +340,7 @@ class ScanViewer(qt.QMainWindow):
 
             # construct a scan
             try:
-                subclass = str(self.ui.scanClassBox.currentText())
+                subclass = self.ui.scanClassBox.currentText()
                 scan_ = getattr(nmutils.core, subclass)()
             except AttributeError:
                 self.statusOutput("Invalid subclass!")
@@ -11,13 +11,21 @@ from silx.gui import qt as QtCore
 QtGui = QtCore
 QtWidgets = QtCore
 
+# icons are decoded once and shared between all windows
+_APP_ICON = None
+_IPYTHON_ICON = None
+
 class Ui_MainWindow(object):
     def setupUi(self, MainWindow):
+        global _APP_ICON, _IPYTHON_ICON
+        # registers the icon resources, on first use only
+        from . import design_rc  # noqa: F401
         MainWindow.setObjectName("MainWindow")
         MainWindow.resize(1082, 678)
-        icon = QtGui.QIcon()
-        icon.addPixmap(QtGui.QPixmap(":/logos/N.png"), QtGui.QIcon.Normal, QtGui.QIcon.Off)
-        MainWindow.setWindowIcon(icon)
+        if _APP_ICON is None:
+            _APP_ICON = QtGui.QIcon()
+            _APP_ICON.addPixmap(QtGui.QPixmap(":/logos/N.png"), QtGui.QIcon.Normal, QtGui.QIcon.Off)
+        MainWindow.setWindowIcon(_APP_ICON)
         self.centralwidget = QtWidgets.QWidget(MainWindow)
         self.centralwidget.setObjectName("centralwidget")
         self.gridLayout_2 = QtWidgets.QGridLayout(self.centralwidget)
@@ -87,9 +95,10 @@ class Ui_MainWindow(object):
         self.gridLayout.addWidget(self.scanNumberBox, 0, 3, 1, 3)
         self.ipythonButton = QtWidgets.QPushButton(self.centralwidget)
         self.ipythonButton.setText("")
-        icon1 = QtGui.QIcon()
-        icon1.addPixmap(QtGui.QPixmap(":/logos/ipython.ico"), QtGui.QIcon.Normal, QtGui.QIcon.Off)
-        self.ipythonButton.setIcon(icon1)
+        if _IPYTHON_ICON is None:
+            _IPYTHON_ICON = QtGui.QIcon()
+            _IPYTHON_ICON.addPixmap(QtGui.QPixmap(":/logos/ipython.ico"), QtGui.QIcon.Normal, QtGui.QIcon.Off)
+        self.ipythonButton.setIcon(_IPYTHON_ICON)
         self.ipythonButton.setIconSize(QtCore.QSize(48, 48))
         self.ipythonButton.setObjectName("ipythonButton")
         self.gridLayout.addWidget(self.ipythonButton, 0, 1, 2, 1)
@@ -226,4 +235,3 @@ from .widgets.ComWidget import ComWidget
 from .widgets.ScalarWidget import ScalarWidget
 from .widgets.XrdWidget import XrdWidget
 from .widgets.XrfWidget import XrfWidget
-from . import design_rc
@@ -3,6 +3,7 @@ from silx.gui.plot.Profile import ProfileToolBar
 from silx.gui.icons import getQIcon
 from silx.gui import qt
 import numpy as np
+from scipy.spatial import cKDTree
 
 class CustomPlotWindow(PlotWindow):
     """
@@ -17,6 +18,38 @@ class CustomPlotWindow(PlotWindow):
 
         super(CustomPlotWindow, self).__init__(parent=parent, position=posInfo, **kwargs)
 
+        # keep the active image data at hand for the mouse-move readout
+        self._activeImage = None
+        self._active = None
+        self.sigActiveImageChanged.connect(self._activeImageChanged)
+
+    def _activeImageChanged(self, *args):
+        """
+        Tracks the active image item, so that its data, origin and
+        scale can be cached rather than looked up on every mouse event.
+        """
+        if self._activeImage is not None:
+            try:
+                self._activeImage.sigItemChanged.disconnect(self._updateActiveCache)
+            except (TypeError, RuntimeError):
+                pass # already disconnected or deleted
+        self._activeImage = self.getActiveImage()
+        if self._activeImage is not None:
+            self._activeImage.sigItemChanged.connect(self._updateActiveCache)
+        self._updateActiveCache()
+
+    def _updateActiveCache(self, *args):
+        image = self._activeImage
+        if image is None:
+            self._active = None
+        else:
+            data = image.getData(copy=False)
+            ox, oy = image.getOrigin()
+            sx, sy = image.getScale()
+            # image extent in plot units, for the bounds check
+            height, width = data.shape[0] * sy, data.shape[1] * sx
+            self._active = (data, ox, oy, sx, sy, width, height)
+
     def _getActiveImageValue(self, x, y):
         """Get value of active image at position (x, y)
 
@@ -24,37 +57,49 @@ class CustomPlotWindow(PlotWindow):
         :param float y: Y position in plot coordinates
         :return: The value at that point or '-'
         """
-        image = self.getActiveImage()
-        if image is not None:
-            data, params = image[0], image[4]
-            ox, oy = params['origin']
-            sx, sy = params['scale']
-            if (y - oy) >= 0 and (x - ox) >= 0:
-                # Test positive before cast otherwisr issue with int(-0.5) = 0
-                row = int((y - oy) // sy)
-                col = int((x - ox) // sx)
-                if (row < data.shape[0] and col < data.shape[1]):
-                    return data[row, col]
-        return '-'
+        if self._active is None:
+            return '-'
+        data, ox, oy, sx, sy, width, height = self._active
+        dx, dy = x - ox, y - oy
+        # Test bounds before cast otherwise issue with int(-0.5) = 0
+        if dx < 0 or dy < 0 or dx >= width or dy >= height:
+            return '-'
+        return data[int(dy // sy), int(dx // sx)]
 
 class PairedWidgetBase(qt.QWidget):
     """
     Base class for XrdWidget, XrfWidget and ScalarWidget. More should
     probably be moved here.
     """
-    
+
+    def setScan(self, scan):
+        """
+        Stores the scan and drops the position lookup tree of any
+        previous scan. The tree is built on the first click selection.
+        Contiguous float32 copies of the position columns are kept for
+        the plot overlays.
+        """
+        self.scan = scan
+        self._kdtree = None
+        self._gridCache = None
+        if scan:
+            self._pos_x = np.ascontiguousarray(scan.positions[:, 0], dtype=np.float32)
+            self._pos_y = np.ascontiguousarray(scan.positions[:, 1], dtype=np.float32)
+        else:
+            self._pos_x = self._pos_y = None
+
     def togglePositions(self):
         if self.map.positionsAction.isChecked():
-            self.map.addCurve(self.scan.positions[:,0], self.scan.positions[:,1], 
+            self.map.addCurve(self._pos_x, self._pos_y,
                 legend='scan positions', symbol='+', color='red', linestyle=' ',
-                resetzoom=False, replace=False)
+                resetzoom=False, replace=False, copy=False)
         else:
             self.map.addCurve([], [], legend='scan positions', resetzoom=False, replace=False)
 
     def indexMarkerOn(self, on):
         if on:
-            self.map.addCurve([self.scan.positions[self.selected_idx, 0]], 
-                [self.scan.positions[self.selected_idx, 1]], symbol='o', color='red', 
+            self.map.addCurve(self._pos_x[self.selected_idx:self.selected_idx+1],
+                self._pos_y[self.selected_idx:self.selected_idx+1], symbol='o', color='red', 
                 linestyle=' ', legend='index marker', resetzoom=False,
                 replace=False)
         else:
@@ -70,8 +115,70 @@ class PairedWidgetBase(qt.QWidget):
         self.selectionMode = 'roi'
 
     def selectByPosition(self, x, y):
-        idx = np.argmin(np.linalg.norm(self.scan.positions - np.array((x, y)), axis=1))
-        self.map.indexBox.setValue(idx)
+        if self._kdtree is None:
+            self._kdtree = cKDTree(self.scan.positions)
+        _, idx = self._kdtree.query((x, y))
+        self.map.indexBox.setValue(int(idx))
+
+    def maskedPositions(self, mask):
+        """
+        Returns the indices of the scan positions which lie under a mask
+        drawn on the interpolated map.
+        """
+        # the grid of the map, to find masked positions on the oversampled
+        # grid. only interpolate again if the map hasn't left it behind.
+        sampling = self.map.interpolBox.value()
+        x, y = self.mapGrid(sampling)
+        maskedPoints = np.vstack((x[np.where(mask)], y[np.where(mask)])).T
+        pointSpacing2 = (x[0,1] - x[0,0])**2 + (y[0,0] - y[1,0])**2
+        # the minimum distance of each position to a selected grid point
+        dist, _ = cKDTree(maskedPoints).query(self.scan.positions, k=1)
+        return np.where(dist**2 < pointSpacing2)[0]
+
+    def mapGrid(self, sampling):
+        """
+        Returns the x and y coordinates of the interpolated map grid for
+        the given oversampling. The grid stored by the last map update
+        is reused when it matches.
+        """
+        key = (id(self.scan), sampling)
+        if self._gridCache is None or self._gridCache[0] != key:
+            dummy = np.zeros(self.scan.nPositions)
+            x, y, z = self.interpolatedMap(dummy, sampling)
+            self.storeGrid(sampling, x, y)
+        return self._gridCache[1]
+
+    def interpolatedMap(self, values, sampling):
+        """
+        Returns the x, y, z map of the values at the scan positions, as
+        Scan.interpolatedMap with the upper left origin of the map plot.
+        Raster scans which provide a gridShape are just reshaped at
+        sampling 1, see Scan.__init__.
+        """
+        shape = getattr(self.scan, 'gridShape', None)
+        if (sampling != 1 or shape is None or min(shape) < 2
+                or shape[0] * shape[1] != self.scan.nPositions):
+            return self.scan.interpolatedMap(values, sampling, origin='ul', method='nearest')
+        x = self.scan.positions[:, 0].reshape(shape)
+        y = self.scan.positions[:, 1].reshape(shape)
+        z = np.reshape(values, shape)
+        # put x along the columns and y along the rows, both increasing
+        if abs(x[1, 0] - x[0, 0]) > abs(x[0, 1] - x[0, 0]):
+            x, y, z = x.T, y.T, z.T
+        if x[0, -1] < x[0, 0]:
+            z = z[:, ::-1]
+        if y[-1, 0] < y[0, 0]:
+            z = z[::-1, :]
+        x, y = np.meshgrid(np.linspace(x.min(), x.max(), z.shape[1]),
+                           np.linspace(y.min(), y.max(), z.shape[0]))
+        return x, y, z
+
+    def storeGrid(self, sampling, x, y):
+        """
+        Keeps the grid of a freshly interpolated map, for later use by
+        maskedPositions.
+        """
+        self._gridCache = ((id(self.scan), sampling), (x, y))
 
     def clearSelection(self):
         # This does everything
@@ -1,7 +1,6 @@
 from silx.gui.plot import PlotWindow
 from silx.gui import qt
 import numpy as np
-import time
 import h5py
 import os, tempfile
 
@@ -56,11 +55,17 @@ class XrfWidget(PairedWidgetBase):
         # keep track of map selections by ROI or by index
         self.selectionMode = 'roi' # 'roi' or 'ind'
 
-        # workaround to avoid multiple updates
-        self.last_map_update = 0.0
+        # coalesce bursts of map update requests, such as from dragging
+        # the ROI, so that only the last one is carried out
+        self._mapTimer = qt.QTimer(self)
+        self._mapTimer.setSingleShot(True)
+        self._mapTimer.setInterval(80)
+        self._mapTimer.timeout.connect(self._doUpdateMap)
 
     def setScan(self, scan):
-        self.scan = scan
+        super(XrfWidget, self).setScan(scan)
+        self._roiChannels = None
+        self._allPositionsMean = None
         if not scan:
             self.map.removeImage('data')
             self.spectrum.addCurve([], [], legend='data')
@@ -73,7 +78,9 @@ class XrfWidget(PairedWidgetBase):
         self.resetSpectrum()
 
     def resetMap(self):
-        self.updateMap()
+        # build the map right away, so there is something to zoom to
+        self._mapTimer.stop()
+        self._doUpdateMap()
         self.map.resetZoom()
 
     def resetSpectrum(self):
@@ -81,10 +88,11 @@ class XrfWidget(PairedWidgetBase):
         self.spectrum.resetZoom()
 
     def updateMap(self):
+        self._mapTimer.start()
+
+    def _doUpdateMap(self):
         if self.scan is None:
             return
-        elif time.time() - self.last_map_update < .05:
-            return
 
         try:
             self.window().statusOutput('Building 1D data map...')
@@ -100,30 +108,41 @@ class XrfWidget(PairedWidgetBase):
                 print("building 1D data map from the whole spectrum")
                 average = np.mean(self.scan.data['1d'], axis=1)
             else:
-                lowerval = roi.getFrom()
-                upperval = roi.getTo()
-                xvector = self.scan.dataAxes['1d'][0]
-                upper = (np.abs(xvector - upperval)).argmin()
-                lower = (np.abs(xvector - lowerval)).argmin()
+                lower, upper = self.roiChannels(roi)
                 print("building 1D data map from channels %d to %d"%(lower, upper))
+                # basic slicing gives a view, so no channels are copied here
                 average = np.mean(self.scan.data['1d'][:, lower:upper], axis=1)
 
             # interpolate and plot map
             sampling = self.map.interpolBox.value()
-            x, y, z = self.scan.interpolatedMap(average, sampling, origin='ul', method='nearest')
+            x, y, z = self.interpolatedMap(average, sampling)
+            self.storeGrid(sampling, x, y)
             self.map.addImage(z, legend='data', 
                 scale=[abs(x[0,0]-x[0,1]), abs(y[0,0]-y[1,0])],
                 origin=[x.min(), y.min()], resetzoom=False)
             self.map.setGraphXLimits(*xlims)
             self.map.setGraphYLimits(*ylims)
             self.window().statusOutput('')
-            self.last_map_update = time.time()
             self.map.setGraphXLabel(self.scan.positionDimLabels[0])
             self.map.setGraphYLabel(self.scan.positionDimLabels[1])
         except:
             self.window().statusOutput('Failed to build 1D data map. See terminal output.')
             raise
 
+    def roiChannels(self, roi):
+        """
+        Returns the channel range covered by a spectrum ROI. The range
+        is cached, and only searched for again when the ROI limits or
+        the scan change.
+        """
+        limits = (roi.getFrom(), roi.getTo())
+        if self._roiChannels is None or self._roiChannels[0] != limits:
+            xvector = self.scan.dataAxes['1d'][0]
+            lower = (np.abs(xvector - limits[0])).argmin()
+            upper = (np.abs(xvector - limits[1])).argmin()
+            self._roiChannels = (limits, lower, upper)
+        return self._roiChannels[1:]
+
     def updateSpectrum(self):
         if self.scan is None:
             return
@@ -136,23 +155,14 @@ class XrfWidget(PairedWidgetBase):
                 self.indexMarkerOn(False)
                 mask = self.map.getMaskToolsDockWidget().widget().getSelectionMask()
                 if (mask is None) or (not np.sum(mask)):
-                    # the mask is empty, don't waste time with positions
-                    print('building 1D curve from all positions')
-                    data = np.mean(self.scan.data['1d'], axis=0)
+                    # the mask is empty, don't waste time with positions,
+                    # and the average over all of them is the same each time
+                    if self._allPositionsMean is None:
+                        print('building 1D curve from all positions')
+                        self._allPositionsMean = np.mean(self.scan.data['1d'], axis=0)
+                    data = self._allPositionsMean
                 else:
-                    # recreate the interpolated grid from above, to find masked
-                    # positions on the oversampled grid
-                    dummy = np.zeros(self.scan.nPositions)
-                    x, y, z = self.scan.interpolatedMap(dummy, self.map.interpolBox.value(), origin='ul')
-                    maskedPoints = np.vstack((x[np.where(mask)], y[np.where(mask)])).T
-                    pointSpacing2 = (x[0,1] - x[0,0])**2 + (y[0,0] - y[1,0])**2
-                    # go through actual positions and find the masked ones
-                    maskedPositions = []
-                    for i in range(self.scan.nPositions):
-                        # the minimum distance of the current position to a selected grid point:
-                        dist2 = np.sum((maskedPoints - self.scan.positions[i])**2, axis=1).min()
-                        if dist2 < pointSpacing2:
-                            maskedPositions.append(i)
+                    maskedPositions = self.maskedPositions(mask)
                     print('building 1D curve from %d positions'%len(maskedPositions))
                     # get the average and replace the image with legend 'data'
                     data = np.mean(self.scan.data['1d'][maskedPositions], axis=0)
@@ -171,10 +181,10 @@ class XrfWidget(PairedWidgetBase):
         Exports the current scan in a format readable by PyMCA.
         """
         self.window().statusOutput("Exporting data for PyMCA...")
-        method, shape, oversampling, equal, ok = PymcaExportDialog().getValues()
+        method, shape, oversampling, equal, chunkSize, compression, ok = PymcaExportDialog().getValues()
         if not ok: return
 
-        basepath = str(self.window().ui.filenameBox.text())
+        basepath = self.window().ui.filenameBox.text()
         defaultpath = os.path.abspath(os.path.join(basepath, os.path.join(os.pardir, os.pardir)))
         filename = qt.QFileDialog.getSaveFileName(parent=self,
                                                   caption='Select output file',
@@ -189,7 +199,8 @@ class XrfWidget(PairedWidgetBase):
             os.remove(filename)
         try:
             self.scan.export(filename, method=method, shape=shape,
-                oversampling=oversampling, equal=equal)
+                oversampling=oversampling, equal=equal,
+                chunkSize=chunkSize, compression=compression)
         except Exception as e:
             print(e)
             self.window().statusOutput("Failed to export data, see terminal for info.")
@@ -223,6 +234,21 @@ class PymcaExportDialog(qt.QDialog):
         self.formGroupBox = qt.QGroupBox("PyMCA needs data layed out on a regular grid.")
         self.formGroupBox.setLayout(layout)
 
+        # form layout for hdf5 storage options
+        layout = qt.QFormLayout()
+        self.chunkSizeBox = qt.QSpinBox()
+        self.chunkSizeBox.setRange(64, 65536)
+        self.chunkSizeBox.setValue(1024)
+        layout.addRow(qt.QLabel("Target chunk size (kB):"), self.chunkSizeBox)
+        self.compressionBox = qt.QComboBox()
+        self.compressionBox.addItem('lzf', 'lzf')
+        self.compressionBox.addItem('gzip', 'gzip')
+        self.compressionBox.addItem('bitshuffle+lz4', 'bitshuffle')
+        self.compressionBox.addItem('none', None)
+        layout.addRow(qt.QLabel("Compression:"), self.compressionBox)
+        self.storageGroupBox = qt.QGroupBox("HDF5 storage")
+        self.storageGroupBox.setLayout(layout)
+
         # ok/cancel buttons
         buttonBox = qt.QDialogButtonBox(qt.QDialogButtonBox.Ok | qt.QDialogButtonBox.Cancel)
         buttonBox.accepted.connect(self.accept)
@@ -231,6 +257,7 @@ class PymcaExportDialog(qt.QDialog):
         # put everything together
         mainLayout = qt.QVBoxLayout()
         mainLayout.addWidget(self.formGroupBox)
+        mainLayout.addWidget(self.storageGroupBox)
         mainLayout.addWidget(buttonBox)
         self.setLayout(mainLayout)
 
@@ -251,4 +278,6 @@ class PymcaExportDialog(qt.QDialog):
         shape = [int(s) for s in shape] if len(shape) == 2 else None
         oversampling = self.oversamplingBox.value()
         equal = self.equalBox.isChecked()
-        return method, shape, oversampling, equal, ok
+        chunkSize = self.chunkSizeBox.value() * 1024
+        compression = self.compressionBox.currentData()
+        return method, shape, oversampling, equal, chunkSize, compression, ok
@@ -3,43 +3,49 @@
 import numpy as np
 from scipy.ndimage import map_coordinates
 
-def shift(a, shifts):
-    """ Shifts an array periodically. """
-    a_ = np.copy(a)
-    shifts = list(map(int, shifts))
-    # shift the first index: turns out to work with negative shifts too
-    if shifts[0]:
-        a_[shifts[0]:, :] = a[:-shifts[0], :]
-        a_[:shifts[0], :] = a[-shifts[0]:, :]
-        a = np.copy(a_)
-    # shift the second index: same here
-    if shifts[1]:
-        a_[:, shifts[1]:] = a[:, :-shifts[1]]
-        a_[:, :shifts[1]] = a[:, -shifts[1]:]
-    return a_
+def shift(a, shifts, out=None):
+    """ Shifts an array periodically. The result can be written to a preallocated array out, which must not overlap with a. """
+    if out is None:
+        shifts = tuple(int(s) for s in shifts[:2])
+        return np.roll(a, shifts, axis=(0, 1))
+    n0, n1 = a.shape[:2]
+    s0, s1 = int(shifts[0]) % n0, int(shifts[1]) % n1
+    out[s0:, s1:] = a[:n0-s0, :n1-s1]
+    out[:s0, s1:] = a[n0-s0:, :n1-s1]
+    out[s0:, :s1] = a[:n0-s0, n1-s1:]
+    out[:s0, :s1] = a[n0-s0:, n1-s1:]
+    return out
         
-def embedMatrix(block, wall, position, mode='center'):
-    """ Embeds a small matrix into a bigger one. If a length-2 tuple is given instead of a big matrix, a zero matrix of that size is used. """
-    if type(wall) == tuple:
-        wall = np.zeros(wall, dtype=block.dtype)
+def _blockSlices(block, position, mode):
+    """ The slices of a bigger matrix covered by block placed at position. """
+    if mode == 'center':
+        hy, hx = block.shape[0] // 2, block.shape[1] // 2
     else:
-        wall = wall.copy()
+        hy, hx = 0, 0
+    y0, x0 = position[0] - hy, position[1] - hx
+    return slice(y0, y0 + block.shape[0]), slice(x0, x0 + block.shape[1])
+
+def embedMatrix(block, wall, position, mode='center', out=None):
+    """ Embeds a small matrix into a bigger one. If a length-2 tuple is given instead of a big matrix, a zero matrix of that size is used. The result can be written to a preallocated array out, which may be wall itself. """
+    if type(wall) == tuple:
+        if out is None:
+            out = np.zeros(wall, dtype=block.dtype)
+        else:
+            out[...] = 0
+    elif out is None:
+        out = wall.copy()
+    elif out is not wall:
+        out[...] = wall
     try: 
-        if mode == 'corner':
-            wall[position[0] : position[0] + block.shape[0], position[1] : position[1] + block.shape[1]] = block
-        if mode == 'center':
-            wall[position[0]-block.shape[0]//2 : position[0]-block.shape[0]//2 + block.shape[0], position[1]-block.shape[1]//2 : position[1]-block.shape[1]//2 + block.shape[1]] = block
+        out[_blockSlices(block, position, mode)] = block
     except ValueError:
         raise ValueError('Trying to put embedded matrix outside the boundaries of the embedding matrix.')
-    return wall
+    return out
     
-def shiftAndMultiply(block, wall, position, mode='center'):
-    """ Does the same as embedMatrix() but returns the product of the two, with dimensions of the small matrix. """
+def shiftAndMultiply(block, wall, position, mode='center', out=None):
+    """ Does the same as embedMatrix() but returns the product of the two, with dimensions of the small matrix. The product can be written to a preallocated array out. """
     try: 
-        if mode == 'corner':
-            return block * wall[position[0] : position[0] + block.shape[0], position[1] : position[1] + block.shape[1]]
-        if mode == 'center':
-            return block * wall[position[0]-block.shape[0]//2 : position[0]-block.shape[0]//2 + block.shape[0], position[1]-block.shape[1]//2 : position[1]-block.shape[1]//2 + block.shape[1]]
+        return np.multiply(block, wall[_blockSlices(block, position, mode)], out=out)
     except ValueError:
         print(block.shape, wall.shape, position)
         raise ValueError('Shifting out of bounds.')